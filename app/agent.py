@@ -1,12 +1,36 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Mapping, MutableMapping, Optional, Tuple
 
 from gagent_core.base_agent import BaseChatAgent
 from gagent_core.websocket_manager import ConnectionManager
 from gagent_core.settings import settings
 from gagent_core.logs import logger
 
+from app.utils import fast_lru
+
+
+# Static guidelines appended to the base prompt. A module constant keeps the
+# cacheable prompt prefix identical across calls.
+CUSTOM_GUIDELINES = """
+        ## CUSTOM GUIDELINES:
+        - Be concise and accurate.
+        - Ask for clarification when needed.
+        """
+
+
+class _ReadOnlyDict(dict):
+    """
+    Dict that rejects mutation. Unlike MappingProxyType it is still a dict,
+    so plans holding it stay JSON-serializable when returned in metadata.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("shared plan context is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
 
 class MyAgent(BaseChatAgent):
     """
@@ -16,6 +40,9 @@ class MyAgent(BaseChatAgent):
     - Structured to be easy to customize
     """
 
+    # Shared read-only context for plans built without user_context
+    _EMPTY_CTX: Mapping[str, Any] = _ReadOnlyDict()
+
     def __init__(self, manager: ConnectionManager):
         super().__init__(manager=manager)
         self.agent_type = "custom"
@@ -26,18 +53,32 @@ class MyAgent(BaseChatAgent):
             "act": "Executing tools",
             "final": "Finalizing response",
         }
+        # Exact-match response cache: (thread_id, user_name, normalized query) -> response
+        self._response_cache: MutableMapping[Any, str] = fast_lru(2048)
 
     def system_prompt(self) -> str:
         """
         Optional: Add your custom system prompt.
         This composes with BaseChatAgent's system prompt.
         """
-        additional = """
-        ## CUSTOM GUIDELINES:
-        - Be concise and accurate.
-        - Ask for clarification when needed.
+        return super().system_prompt() + "\n\n" + CUSTOM_GUIDELINES
+
+    def system_prompt_segments(self, dynamic_context: str = "") -> List[Dict[str, Any]]:
+        """
+        Split the system prompt into a cacheable prefix and a per-turn tail.
+
+        The first segment (base prompt + static guidelines) is byte-identical
+        across calls and marked with cache_control, so providers with prompt
+        prefix caching reuse it. Anything that changes per turn, such as
+        ConversationContext.to_prompt_context(), must go in dynamic_context
+        so it lands after the cache breakpoint.
         """
-        return super().system_prompt() + "\n\n" + additional
+        segments: List[Dict[str, Any]] = [
+            {"type": "text", "text": self.system_prompt(), "cache_control": {"type": "ephemeral"}},
+        ]
+        if dynamic_context:
+            segments.append({"type": "text", "text": dynamic_context})
+        return segments
 
     async def process_message(
         self,
@@ -52,6 +93,21 @@ class MyAgent(BaseChatAgent):
         Main processing entry point.
         Return (response_text, metadata_dict).
         """
+        cache_key = self._response_cache_key(thread_id, query, user_name, user_context, files)
+        response = self._response_cache.get(cache_key) if cache_key is not None else None
+        if response is not None:
+            # Same step/state bookkeeping as a full run, minus tools
+            for step in range(4):
+                await self.update_step(thread_id, step)
+            state = await self.load_state(thread_id) or {}
+            state["last_query"] = query
+            await self.save_state(thread_id, state)
+
+            meta = metadata or {}
+            # Planning is cheap; rebuilding it reflects this caller's query verbatim
+            meta.update({"plan": self._plan_response(query, user_context), "cache_hit": True})
+            return response, meta
+
         # Step 0: Initialize
         await self.update_step(thread_id, 0)
 
@@ -72,6 +128,9 @@ class MyAgent(BaseChatAgent):
 
         await self.save_state(thread_id, state)
 
+        if cache_key is not None:
+            self._response_cache[cache_key] = response
+
         meta = metadata or {}
         meta.update({"plan": plan})
         return response, meta
@@ -79,11 +138,28 @@ class MyAgent(BaseChatAgent):
     # ---------------------------
     # Internal helpers
     # ---------------------------
+    @staticmethod
+    def _response_cache_key(
+        thread_id: str,
+        query: str,
+        user_name: Optional[str],
+        user_context: Optional[Dict[str, Any]],
+        files: Optional[List[Dict[str, Any]]],
+    ) -> Optional[Tuple[str, str, str]]:
+        """
+        Key for the exact-match response cache, or None when the answer may
+        depend on more than the query text (anonymous user, user context or
+        attached files). Entries are scoped to the thread.
+        """
+        if user_name is None or user_context is not None or files:
+            return None
+        return thread_id, user_name, query.strip().casefold()
+
     def _plan_response(self, query: str, user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         return {
             "intent": "general_assistance",
             "query": query,
-            "context": user_context or {},
+            "context": user_context if user_context is not None else self._EMPTY_CTX,
         }
 
     def _execute_plan(self, plan: Dict[str, Any]) -> str:
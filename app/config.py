@@ -2,11 +2,28 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PORT = 8000
+
+
+def _env_port() -> int:
+    raw = os.getenv("APP_PORT")
+    if not raw:
+        return _DEFAULT_PORT
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Invalid APP_PORT %r, falling back to %d", raw, _DEFAULT_PORT)
+        return _DEFAULT_PORT
+
 
 @dataclass(frozen=True)
 class AppSettings:
-    host: str = os.getenv("APP_HOST", "0.0.0.0")
-    port: int = int(os.getenv("APP_PORT", "8000"))
+    # Read the environment when an instance is created, not at import time
+    host: str = field(default_factory=lambda: os.getenv("APP_HOST", "0.0.0.0"))
+    port: int = field(default_factory=_env_port)
@@ -4,17 +4,38 @@ Conversation Context Management for multi-turn awareness.
 Tracks user intent history, recent topics, tool usage, and unresolved queries
 per thread_id to enable proactive, context-aware responses.
 """
+import sys
+import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Any, Set
 
-from app.utils import LRUDict
 
+_NEW_CONVERSATION_PROMPT = """
+## CONVERSATION CONTEXT
+This is a **new conversation**. The user is reaching out for the first time in this session.
+- Greet them warmly and establish rapport
+- Be ready to help with any PACI-related inquiry
+"""
 
-@dataclass
+_CONTEXT_PROMPT_TEMPLATE = """
+## CONVERSATION CONTEXT
+{summary}
+
+**Guidelines based on context:**
+- Reference previous topics naturally when relevant
+- If the user seems to be continuing a previous thread, acknowledge it
+- Proactively offer related services based on what they've discussed
+- Remember their language preference and communication style
+"""
+
+
+@dataclass(slots=True)
 class ConversationTurn:
     """Represents a single conversation turn with metadata."""
-    timestamp: datetime
+    timestamp: int  # time.monotonic_ns(); only used for ordering, not wall-clock display
     user_message: str
     detected_language: str
     tools_used: List[str] = field(default_factory=list)
@@ -25,7 +46,7 @@ class ConversationTurn:
     user_sentiment: Optional[str] = None  # positive, neutral, frustrated
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationContext:
     """
     Holds the complete context for a single conversation thread.
@@ -38,7 +59,8 @@ class ConversationContext:
     """
     thread_id: str
     created_at: datetime = field(default_factory=datetime.now)
-    turns: List[ConversationTurn] = field(default_factory=list)
+    # Bounded by ConversationMemory via deque(maxlen=...): oldest turns drop off in O(1)
+    turns: Deque[ConversationTurn] = field(default_factory=deque)
 
     # Aggregated context for quick access
     all_topics_discussed: List[str] = field(default_factory=list)
@@ -48,7 +70,7 @@ class ConversationContext:
 
     # Conversation state
     is_first_interaction: bool = True
-    last_interaction: Optional[datetime] = None
+    last_interaction: Optional[int] = None  # monotonic ns of the latest turn
     unresolved_query: Optional[str] = None
     conversation_goal: Optional[str] = None  # e.g., "renew civil id", "get digital signature"
 
@@ -56,24 +78,85 @@ class ConversationContext:
     inferred_user_type: Optional[str] = None  # citizen, resident, business
     mentioned_services: List[str] = field(default_factory=list)
 
+    # Shadow sets backing the aggregate lists above for O(1) membership checks
+    _topics_seen: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _tools_seen: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _services_seen: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _suggestions_seen: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+
+    # Rendered to_prompt_context() output and the state it was rendered from
+    _prompt_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _prompt_cache_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    # Summary lines that do not depend on turns, and the state they came from
+    _state_lines: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+    _state_lines_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Seed the shadow sets when aggregates are passed in at construction
+        self._topics_seen.update(self.all_topics_discussed)
+        self._tools_seen.update(self.all_tools_used)
+        self._services_seen.update(self.mentioned_services)
+        self._suggestions_seen.update(self.pending_suggestions)
+
     def add_turn(self, turn: ConversationTurn) -> None:
-        """Add a new conversation turn and update aggregated context."""
+        """
+        Add a new conversation turn and update aggregated context.
+
+        If a rendered prompt is cached, it is extended in place: only the
+        turn-dependent summary lines are rebuilt, and the next
+        to_prompt_context() call is a cache hit.
+        """
         self.turns.append(turn)
+        had_prompt = self._prompt_cache is not None
         self.is_first_interaction = False
         self.last_interaction = turn.timestamp
 
         # Update aggregates
         for topic in turn.topics_discussed:
-            if topic not in self.all_topics_discussed:
+            if topic not in self._topics_seen:
+                self._topics_seen.add(topic)
                 self.all_topics_discussed.append(topic)
 
         for tool in turn.tools_used:
-            if tool not in self.all_tools_used:
+            if tool not in self._tools_seen:
+                self._tools_seen.add(tool)
                 self.all_tools_used.append(tool)
 
+        if had_prompt:
+            self._render_prompt()
+
+    def add_service(self, service: str) -> None:
+        """Track a mentioned service, ignoring duplicates."""
+        if service not in self._services_seen:
+            self._services_seen.add(service)
+            self.mentioned_services.append(service)
+            self._prompt_cache = None
+
+    def add_suggestion(self, suggestion: str, keep_last: int = 5) -> None:
+        """Queue a pending suggestion, ignoring duplicates and keeping only the last N."""
+        if suggestion in self._suggestions_seen:
+            return
+        self.pending_suggestions.append(suggestion)
+        self._suggestions_seen.add(suggestion)
+        self._prompt_cache = None
+        if len(self.pending_suggestions) > keep_last:
+            for dropped in self.pending_suggestions[:-keep_last]:
+                self._suggestions_seen.discard(dropped)
+            self.pending_suggestions = self.pending_suggestions[-keep_last:]
+
+    def clear_suggestions(self) -> None:
+        """Drop all pending suggestions."""
+        self.pending_suggestions = []
+        self._suggestions_seen.clear()
+        self._prompt_cache = None
+
+    def invalidate_prompt_cache(self) -> None:
+        """Force the next to_prompt_context() call to re-render."""
+        self._prompt_cache = None
+
     def get_recent_turns(self, count: int = 3) -> List[ConversationTurn]:
         """Get the most recent N turns for context injection."""
-        return self.turns[-count:] if self.turns else []
+        return list(islice(self.turns, max(0, len(self.turns) - count), None))
 
     def get_context_summary(self) -> str:
         """
@@ -87,16 +170,34 @@ class ConversationContext:
         """
         if not self.turns:
             return "This is the start of a new conversation."
+        return "\n".join(self._turn_lines() + self._state_summary_lines())
 
-        lines = []
-
-        # Conversation history summary
-        lines.append(f"**Conversation History:** {len(self.turns)} previous exchanges")
+    def _turn_lines(self) -> List[str]:
+        """Summary lines that change with every turn."""
+        lines = [f"**Conversation History:** {len(self.turns)} previous exchanges"]
 
         # Recent topics
         if self.all_topics_discussed:
             recent_topics = self.all_topics_discussed[-5:]  # Last 5 topics
             lines.append(f"**Recent Topics:** {', '.join(recent_topics)}")
+        return lines
+
+    def _state_key(self) -> tuple:
+        """Fingerprint of the turn-independent state the summary renders."""
+        return (
+            self.conversation_goal,
+            self.unresolved_query,
+            len(self.mentioned_services),
+            tuple(self.pending_suggestions[:2]),
+        )
+
+    def _state_summary_lines(self) -> List[str]:
+        """Summary lines that do not depend on turns, rebuilt only when that state changes."""
+        key = self._state_key()
+        if self._state_lines is not None and key == self._state_lines_key:
+            return self._state_lines
+
+        lines = []
 
         # Services mentioned
         if self.mentioned_services:
@@ -114,37 +215,47 @@ class ConversationContext:
         if self.pending_suggestions:
             lines.append(f"**Consider Suggesting:** {', '.join(self.pending_suggestions[:2])}")
 
-        return "\n".join(lines)
+        self._state_lines = lines
+        self._state_lines_key = key
+        return lines
 
-    def to_prompt_context(self) -> str:
-        """Format context for direct injection into system prompt."""
+    def _prompt_state(self) -> tuple:
+        """Cheap fingerprint of everything to_prompt_context() renders."""
+        return (self.is_first_interaction, len(self.turns), self.last_interaction) + self._state_key()
+
+    def _render_prompt(self) -> str:
         if self.is_first_interaction:
-            return """
-## CONVERSATION CONTEXT
-This is a **new conversation**. The user is reaching out for the first time in this session.
-- Greet them warmly and establish rapport
-- Be ready to help with any PACI-related inquiry
-"""
+            rendered = _NEW_CONVERSATION_PROMPT
+        else:
+            rendered = _CONTEXT_PROMPT_TEMPLATE.format(summary=self.get_context_summary())
+        self._prompt_cache = rendered
+        self._prompt_cache_key = self._prompt_state()
+        return rendered
 
-        summary = self.get_context_summary()
-        return f"""
-## CONVERSATION CONTEXT
-{summary}
+    def to_prompt_context(self) -> str:
+        """
+        Format context for direct injection into system prompt.
 
-**Guidelines based on context:**
-- Reference previous topics naturally when relevant
-- If the user seems to be continuing a previous thread, acknowledge it
-- Proactively offer related services based on what they've discussed
-- Remember their language preference and communication style
-"""
+        The rendered block is cached until the context changes, so repeated
+        prompt builds for the same turn reuse the same string.
+        """
+        if self._prompt_cache is not None and self._prompt_state() == self._prompt_cache_key:
+            return self._prompt_cache
+        return self._render_prompt()
 
 
 class ConversationMemory:
     """
-    Thread-safe conversation memory store using LRU eviction.
+    Conversation memory store using LRU eviction.
 
     Manages ConversationContext instances across multiple threads,
     automatically evicting old conversations when memory limit is reached.
+
+    Not thread-safe by design: the store is owned by the asyncio event loop
+    that serves the WebSocket sessions, and none of its methods await, so
+    each call runs to completion without interleaving. Offload work to other
+    OS threads only through the loop (e.g. ``loop.call_soon_threadsafe``)
+    rather than calling these methods from them directly.
     """
 
     def __init__(self, max_threads: int = 500, max_turns_per_thread: int = 50):
@@ -155,7 +266,9 @@ class ConversationMemory:
             max_threads: Maximum number of conversation threads to keep in memory
             max_turns_per_thread: Maximum turns to keep per conversation (older turns evicted)
         """
-        self._contexts: LRUDict = LRUDict(max_size=max_threads)
+        # Plain OrderedDict so recency is tracked with the C-level move_to_end
+        self._contexts: "OrderedDict[str, ConversationContext]" = OrderedDict()
+        self._max_threads = max_threads
         self._max_turns = max_turns_per_thread
 
     def get_context(self, thread_id: str) -> ConversationContext:
@@ -169,9 +282,16 @@ class ConversationMemory:
             ConversationContext instance (existing or newly created)
         """
         context = self._contexts.get(thread_id)
-        if context is None:
-            context = ConversationContext(thread_id=thread_id)
-            self._contexts[thread_id] = context
+        if context is not None:
+            # Mark as most recently used
+            self._contexts.move_to_end(thread_id)
+            return context
+
+        if len(self._contexts) >= self._max_threads:
+            # Evict the least recently used conversation
+            self._contexts.popitem(last=False)
+        context = ConversationContext(thread_id=thread_id, turns=deque(maxlen=self._max_turns))
+        self._contexts[thread_id] = context
         return context
 
     def update_context(
@@ -201,50 +321,44 @@ class ConversationMemory:
         """
         context = self.get_context(thread_id)
 
+        # Languages, tool names and topics come from a small vocabulary repeated
+        # on every turn; intern them so all threads share one copy of each
         turn = ConversationTurn(
-            timestamp=datetime.now(),
+            timestamp=time.monotonic_ns(),
             user_message=user_message,
-            detected_language=detected_language,
-            tools_used=tools_used or [],
+            detected_language=sys.intern(detected_language),
+            tools_used=[sys.intern(tool) for tool in tools_used] if tools_used else [],
             tool_results_summary=tool_results_summary or {},
-            topics_discussed=topics_discussed or [],
+            topics_discussed=[sys.intern(topic) for topic in topics_discussed] if topics_discussed else [],
             intent_detected=intent_detected,
         )
 
+        # Turns beyond max_turns_per_thread are evicted by the bounded deque
         context.add_turn(turn)
 
-        # Evict old turns if over limit
-        if len(context.turns) > self._max_turns:
-            context.turns = context.turns[-self._max_turns:]
-
-        # Update the context in LRU (marks as recently used)
-        self._contexts[thread_id] = context
-
         return context
 
     def add_pending_suggestion(self, thread_id: str, suggestion: str) -> None:
         """Add a proactive suggestion to be offered to the user."""
         context = self.get_context(thread_id)
-        if suggestion not in context.pending_suggestions:
-            context.pending_suggestions.append(suggestion)
-            # Keep only last 5 suggestions
-            context.pending_suggestions = context.pending_suggestions[-5:]
+        # Keep only last 5 suggestions; they are drawn from the fixed suggestion tables
+        context.add_suggestion(sys.intern(suggestion), keep_last=5)
 
     def clear_pending_suggestions(self, thread_id: str) -> None:
         """Clear pending suggestions after they've been offered."""
         context = self.get_context(thread_id)
-        context.pending_suggestions = []
+        context.clear_suggestions()
 
     def set_conversation_goal(self, thread_id: str, goal: str) -> None:
         """Set the detected user goal for this conversation."""
         context = self.get_context(thread_id)
         context.conversation_goal = goal
+        context.invalidate_prompt_cache()
 
     def add_mentioned_service(self, thread_id: str, service: str) -> None:
         """Track a PACI service that was discussed."""
         context = self.get_context(thread_id)
-        if service not in context.mentioned_services:
-            context.mentioned_services.append(service)
+        context.add_service(sys.intern(service))
 
     def get_thread_count(self) -> int:
         """Get the current number of active conversation threads."""
@@ -4,13 +4,23 @@ Proactive Suggestion Engine for PACI Agent.
 Analyzes conversation context and tool results to generate helpful,
 proactive follow-up suggestions that enhance the user experience.
 """
-from typing import List, Dict, Optional, Tuple
+import heapq
+import re
+import sys
+from functools import cache, lru_cache
+from itertools import chain
+from typing import Callable, FrozenSet, List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 
 from app.context.conversation import ConversationContext
 
+try:
+    import ahocorasick  # pyahocorasick (optional, C-accelerated multi-pattern search)
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
 
-@dataclass
+
+@dataclass(slots=True)
 class Suggestion:
     """A proactive suggestion to offer the user."""
     text_ar: str  # Arabic version
@@ -21,98 +31,249 @@ class Suggestion:
 
 
 # Suggestion templates based on context patterns
-SUGGESTION_TRIGGERS: Dict[str, List[Suggestion]] = {
-    # After discussing digital signatures
-    "digital_signature": [
-        Suggestion(
-            text_ar="هل تبي أساعدك تحجز موعد للتوقيع الرقمي؟ 📅",
-            text_en="Would you like me to help you book an appointment for digital signature registration? 📅",
-            trigger_reason="User discussed digital signatures",
-            priority=4,
-            service_related="digital_signature"
-        ),
-        Suggestion(
-            text_ar="تبي أشرح لك خطوات التسجيل بالتفصيل؟",
-            text_en="Would you like me to walk you through the registration steps?",
-            trigger_reason="User asked about digital signatures",
-            priority=3,
-            service_related="digital_signature"
-        ),
-    ],
-
-    # After discussing Civil ID
-    "civil_id": [
-        Suggestion(
-            text_ar="تبي أشيك لك على حالة طلبك؟ 🔍",
-            text_en="Would you like me to check your application status? 🔍",
-            trigger_reason="User discussed Civil ID",
-            priority=5,
-            service_related="civil_id_status"
+@cache
+def _get_suggestion_triggers() -> Dict[str, List[Suggestion]]:
+    """Suggestion templates by topic, built on first use."""
+    return {
+        # After discussing digital signatures
+        "digital_signature": [
+            Suggestion(
+                text_ar="هل تبي أساعدك تحجز موعد للتوقيع الرقمي؟ 📅",
+                text_en="Would you like me to help you book an appointment for digital signature registration? 📅",
+                trigger_reason="User discussed digital signatures",
+                priority=4,
+                service_related="digital_signature"
+            ),
+            Suggestion(
+                text_ar="تبي أشرح لك خطوات التسجيل بالتفصيل؟",
+                text_en="Would you like me to walk you through the registration steps?",
+                trigger_reason="User asked about digital signatures",
+                priority=3,
+                service_related="digital_signature"
+            ),
+        ],
+
+        # After discussing Civil ID
+        "civil_id": [
+            Suggestion(
+                text_ar="تبي أشيك لك على حالة طلبك؟ 🔍",
+                text_en="Would you like me to check your application status? 🔍",
+                trigger_reason="User discussed Civil ID",
+                priority=5,
+                service_related="civil_id_status"
+            ),
+            Suggestion(
+                text_ar="أقدر أساعدك تعرف المستندات المطلوبة",
+                text_en="I can help you find out the required documents",
+                trigger_reason="User mentioned Civil ID",
+                priority=3,
+                service_related="civil_id_requirements"
+            ),
+        ],
+
+        # After discussing appointments
+        "appointment": [
+            Suggestion(
+                text_ar="تبي أعرض لك المواعيد المتاحة؟ 📆",
+                text_en="Would you like me to show you available appointment slots? 📆",
+                trigger_reason="User mentioned appointments",
+                priority=5,
+                service_related="appointment_booking"
+            ),
+        ],
+
+        # After discussing renewal
+        "renewal": [
+            Suggestion(
+                text_ar="أقدر أشيك لك إذا بطاقتك قربت تنتهي",
+                text_en="I can check if your ID is approaching expiration",
+                trigger_reason="User discussed renewal",
+                priority=4,
+                service_related="civil_id_renewal"
+            ),
+        ],
+
+        # General PACI inquiry
+        "general_paci": [
+            Suggestion(
+                text_ar="تبي أعرض لك الخدمات الإلكترونية المتاحة؟ 💻",
+                text_en="Would you like me to show you the available e-services? 💻",
+                trigger_reason="General PACI inquiry",
+                priority=2,
+                service_related="e_services"
+            ),
+        ],
+    }
+
+# Keywords that trigger specific suggestion categories.
+# Kept lowercase (Arabic has no case) and as tuples; they are folded once when indexed, never per call.
+@cache
+def _get_topic_keywords() -> Dict[str, Tuple[str, ...]]:
+    """Trigger keywords by topic, built on first use."""
+    keywords = {
+        "digital_signature": (
+            "signature", "sign", "digital", "توقيع", "رقمي", "certificate", "شهادة",
+            "encrypt", "تشفير", "pin", "رقم سري"
         ),
-        Suggestion(
-            text_ar="أقدر أساعدك تعرف المستندات المطلوبة",
-            text_en="I can help you find out the required documents",
-            trigger_reason="User mentioned Civil ID",
-            priority=3,
-            service_related="civil_id_requirements"
+        "civil_id": (
+            "civil id", "بطاقة", "مدنية", "هوية", "card", "id card", "بطاقة مدنية",
+            "civil number", "رقم مدني"
         ),
-    ],
-
-    # After discussing appointments
-    "appointment": [
-        Suggestion(
-            text_ar="تبي أعرض لك المواعيد المتاحة؟ 📆",
-            text_en="Would you like me to show you available appointment slots? 📆",
-            trigger_reason="User mentioned appointments",
-            priority=5,
-            service_related="appointment_booking"
+        "appointment": (
+            "appointment", "موعد", "book", "حجز", "schedule", "جدول", "visit", "زيارة",
+            "slot", "available"
         ),
-    ],
-
-    # After discussing renewal
-    "renewal": [
-        Suggestion(
-            text_ar="أقدر أشيك لك إذا بطاقتك قربت تنتهي",
-            text_en="I can check if your ID is approaching expiration",
-            trigger_reason="User discussed renewal",
-            priority=4,
-            service_related="civil_id_renewal"
+        "renewal": (
+            "renew", "تجديد", "expire", "انتهاء", "validity", "صلاحية", "extend", "تمديد"
         ),
-    ],
-
-    # General PACI inquiry
-    "general_paci": [
-        Suggestion(
-            text_ar="تبي أعرض لك الخدمات الإلكترونية المتاحة؟ 💻",
-            text_en="Would you like me to show you the available e-services? 💻",
-            trigger_reason="General PACI inquiry",
-            priority=2,
-            service_related="e_services"
+        "general_paci": (
+            "paci", "هيئة", "service", "خدمة", "help", "مساعدة", "information", "معلومات"
         ),
-    ],
-}
-
-# Keywords that trigger specific suggestion categories
-TOPIC_KEYWORDS: Dict[str, List[str]] = {
-    "digital_signature": [
-        "signature", "sign", "digital", "توقيع", "رقمي", "certificate", "شهادة",
-        "encrypt", "تشفير", "pin", "رقم سري"
-    ],
-    "civil_id": [
-        "civil id", "بطاقة", "مدنية", "هوية", "card", "id card", "بطاقة مدنية",
-        "civil number", "رقم مدني"
-    ],
-    "appointment": [
-        "appointment", "موعد", "book", "حجز", "schedule", "جدول", "visit", "زيارة",
-        "slot", "available"
-    ],
-    "renewal": [
-        "renew", "تجديد", "expire", "انتهاء", "validity", "صلاحية", "extend", "تمديد"
-    ],
-    "general_paci": [
-        "paci", "هيئة", "service", "خدمة", "help", "مساعدة", "information", "معلومات"
-    ],
-}
+    }
+    # Topic names are stored on every turn across threads; interning keeps one
+    # copy of each and lets equality checks short-circuit on identity
+    return {sys.intern(topic): words for topic, words in keywords.items()}
+
+
+# Compiled suggestion row: (priority, text_ar, text_en)
+CompiledSuggestion = Tuple[int, str, str]
+
+
+def _compile_triggers(
+    triggers: Dict[str, List[Suggestion]]
+) -> Dict[str, Tuple[CompiledSuggestion, ...]]:
+    """
+    Compile Suggestion objects into plain tuples pre-sorted by priority.
+
+    Only priority and the two texts are read on the hot path, so the rest of
+    each Suggestion (trigger_reason, service_related) stays out of it.
+
+    Args:
+        triggers: Mapping of topic category to its suggestions
+
+    Returns:
+        Mapping of topic to (priority, text_ar, text_en) rows, highest priority first
+    """
+    compiled: Dict[str, Tuple[CompiledSuggestion, ...]] = {}
+    for topic, suggestions in triggers.items():
+        # sorted() is stable, so equal priorities keep their declaration order
+        ranked = sorted(suggestions, key=lambda s: s.priority, reverse=True)
+        compiled[sys.intern(topic)] = tuple(
+            (s.priority, sys.intern(s.text_ar), sys.intern(s.text_en)) for s in ranked
+        )
+    return compiled
+
+
+def _by_priority(item: Tuple[int, str]) -> int:
+    return -item[0]
+
+
+@cache
+def _get_compiled_by_lang() -> Dict[str, Dict[str, Tuple[Tuple[int, str], ...]]]:
+    """Per-language (priority, text) views of the compiled triggers so lookups never branch on language."""
+    compiled = _compile_triggers(_get_suggestion_triggers())
+    return {
+        lang: {topic: tuple((row[0], row[index]) for row in rows) for topic, rows in compiled.items()}
+        for lang, index in (("ar", 1), ("en", 2))
+    }
+
+
+def _index_keywords(topic_keywords: Dict[str, Tuple[str, ...]]) -> Dict[str, FrozenSet[str]]:
+    """
+    Build the reverse keyword -> topics index once, so matching never walks
+    the per-topic keyword lists.
+
+    Args:
+        topic_keywords: Mapping of topic category to its trigger keywords
+
+    Returns:
+        Mapping of lowercased keyword to the topics it triggers
+    """
+    index: Dict[str, Set[str]] = {}
+    for topic, keywords in topic_keywords.items():
+        for keyword in keywords:
+            index.setdefault(keyword.casefold(), set()).add(topic)
+    return {keyword: frozenset(topics) for keyword, topics in index.items()}
+
+
+def _build_topic_matcher(keyword_topics: Dict[str, FrozenSet[str]]) -> Callable[[str], Set[str]]:
+    """
+    Compile all topic keywords into a single multi-pattern matcher.
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, otherwise
+    one alternation regex, so a message is scanned once instead of once per
+    keyword.
+
+    Args:
+        keyword_topics: Reverse keyword -> topics index from _index_keywords
+
+    Returns:
+        Callable taking lowercased text and returning the set of matched topics
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword, topics in keyword_topics.items():
+            automaton.add_word(keyword, topics)
+        automaton.make_automaton()
+
+        def match(text: str) -> Set[str]:
+            return {topic for _, topics in automaton.iter(text) for topic in topics}
+
+        return match
+
+    # The zero-width lookahead tries the alternation at every position, so
+    # overlapping keywords (e.g. "help" + "pin" in "helpin") are all reported.
+    # Alternation is longest-first, which can hide shorter keywords that are a
+    # prefix of the reported one; fold their topics in ahead of time.
+    prefix_topics = {
+        keyword: frozenset().union(
+            *(topics for other, topics in keyword_topics.items() if keyword.startswith(other))
+        )
+        for keyword in keyword_topics
+    }
+    pattern = re.compile(
+        "(?=("
+        + "|".join(re.escape(kw) for kw in sorted(keyword_topics, key=len, reverse=True))
+        + "))"
+    )
+
+    def match(text: str) -> Set[str]:
+        return {topic for m in pattern.finditer(text) for topic in prefix_topics[m.group(1)]}
+
+    return match
+
+
+@cache
+def _get_topic_matcher() -> Callable[[str], Set[str]]:
+    """Keyword matcher over all topics, compiled on first use."""
+    return _build_topic_matcher(_index_keywords(_get_topic_keywords()))
+
+
+def __getattr__(name: str):
+    # SUGGESTION_TRIGGERS / TOPIC_KEYWORDS stay importable but are only built when first accessed
+    if name == "SUGGESTION_TRIGGERS":
+        return _get_suggestion_triggers()
+    if name == "TOPIC_KEYWORDS":
+        return _get_topic_keywords()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _normalize(text: str) -> str:
+    """
+    Case-fold text for keyword matching.
+
+    Not memoized: hashing the key costs about as much as folding it, and a
+    cache would keep large tool results alive after their turn.
+    """
+    return text.casefold()
+
+
+@lru_cache(maxsize=256)
+def _detect_topics_cached(text: str) -> Tuple[str, ...]:
+    """Memoized topic detection; repeated messages and goals skip the scan entirely."""
+    found = _get_topic_matcher()(_normalize(text))
+    # Preserve TOPIC_KEYWORDS order so suggestion priority ties stay deterministic
+    return tuple(topic for topic in _get_topic_keywords() if topic in found)
 
 
 class ProactiveSuggestionEngine:
@@ -126,8 +287,8 @@ class ProactiveSuggestionEngine:
     """
 
     def __init__(self):
-        self.suggestion_triggers = SUGGESTION_TRIGGERS
-        self.topic_keywords = TOPIC_KEYWORDS
+        self.suggestion_triggers = _get_suggestion_triggers()
+        self.topic_keywords = _get_topic_keywords()
 
     def detect_topics(self, text: str) -> List[str]:
         """
@@ -139,14 +300,7 @@ class ProactiveSuggestionEngine:
         Returns:
             List of detected topic categories
         """
-        text_lower = text.lower()
-        detected = []
-
-        for topic, keywords in self.topic_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                detected.append(topic)
-
-        return detected
+        return list(_detect_topics_cached(text))
 
     def get_suggestions_for_topics(
         self,
@@ -165,17 +319,24 @@ class ProactiveSuggestionEngine:
         Returns:
             List of suggestion text strings
         """
-        all_suggestions: List[Tuple[int, str]] = []  # (priority, text)
+        table = _get_compiled_by_lang()["ar" if language == "arabic_kuwaiti" else "en"]
 
-        for topic in topics:
-            if topic in self.suggestion_triggers:
-                for suggestion in self.suggestion_triggers[topic]:
-                    text = suggestion.text_ar if language == "arabic_kuwaiti" else suggestion.text_en
-                    all_suggestions.append((suggestion.priority, text))
+        # Per-topic tables are already priority-sorted; merging them keeps the
+        # global order (ties resolved by topic order) without a per-call sort
+        ranked = heapq.merge(
+            *(table.get(topic, ()) for topic in topics),
+            key=_by_priority,
+        )
 
-        # Sort by priority (descending) and take top N
-        all_suggestions.sort(key=lambda x: x[0], reverse=True)
-        return [text for _, text in all_suggestions[:max_suggestions]]
+        seen = set()
+        result: List[str] = []
+        for _, text in ranked:
+            if len(result) >= max_suggestions:
+                break
+            if text not in seen:
+                seen.add(text)
+                result.append(text)
+        return result
 
     def analyze_tool_result_for_suggestions(
         self,
@@ -201,18 +362,19 @@ class ProactiveSuggestionEngine:
 
         # PACI knowledge search -> suggest related actions
         if tool_name == "search_paci_knowledge":
-            if "signature" in tool_result.lower() or "توقيع" in tool_result:
+            result_lower = _normalize(tool_result)
+            if "signature" in result_lower or "توقيع" in tool_result:
                 suggestions.extend(
                     self.get_suggestions_for_topics(["digital_signature"], language, 1)
                 )
-            if "civil" in tool_result.lower() or "مدنية" in tool_result:
+            if "civil" in result_lower or "مدنية" in tool_result:
                 suggestions.extend(
                     self.get_suggestions_for_topics(["civil_id"], language, 1)
                 )
 
         # Application status check -> suggest next steps
         if tool_name == "check_application_status":
-            if "pending" in tool_result.lower() or "قيد المعالجة" in tool_result:
+            if "pending" in _normalize(tool_result) or "قيد المعالجة" in tool_result:
                 if language == "arabic_kuwaiti":
                     suggestions.append("تبيني أذكرك لما يتغير حالة طلبك؟ 🔔")
                 else:
@@ -254,26 +416,34 @@ class ProactiveSuggestionEngine:
         current_topics = self.detect_topics(current_message)
 
         # Also consider previously discussed topics
-        all_relevant_topics = list(set(current_topics + context.all_topics_discussed[-3:]))
-
-        # Get base suggestions from topics
-        suggestions = self.get_suggestions_for_topics(all_relevant_topics, language, 2)
-
-        # Add goal-based suggestions
+        # (dict.fromkeys dedups while keeping order, so priority ties are deterministic)
+        all_relevant_topics = list(dict.fromkeys(chain(current_topics, context.all_topics_discussed[-3:])))
+
+        table = _get_compiled_by_lang()["ar" if language == "arabic_kuwaiti" else "en"]
+
+        # Stream base suggestions in priority order, deduplicating inline and
+        # stopping as soon as two unique ones are found
+        seen: Set[str] = set()
+        suggestions: List[str] = []
+        ranked = heapq.merge(
+            *(table.get(topic, ()) for topic in all_relevant_topics),
+            key=_by_priority,
+        )
+        for _, text in ranked:
+            if text not in seen:
+                seen.add(text)
+                suggestions.append(text)
+                if len(suggestions) == 2:
+                    return suggestions
+
+        # Fill a remaining slot with the top goal-based suggestion
         if context.conversation_goal:
             goal_topics = self.detect_topics(context.conversation_goal)
             goal_suggestions = self.get_suggestions_for_topics(goal_topics, language, 1)
-            suggestions.extend(goal_suggestions)
-
-        # Deduplicate and limit
-        seen = set()
-        unique_suggestions = []
-        for s in suggestions:
-            if s not in seen:
-                seen.add(s)
-                unique_suggestions.append(s)
+            if goal_suggestions and goal_suggestions[0] not in seen:
+                suggestions.append(goal_suggestions[0])
 
-        return unique_suggestions[:2]
+        return suggestions
 
     def get_greeting_suggestion(
         self,
@@ -5,6 +5,8 @@ from typing import Any, Dict, Optional
 from gagent_core.websocket_manager import ConnectionManager
 from gagent_core.logs import logger
 
+from app.utils import SessionPool
+
 
 class CustomManager(ConnectionManager):
     """
@@ -15,6 +17,8 @@ class CustomManager(ConnectionManager):
     def __init__(self, session_steps: Optional[list[str]] = None, enable_citations: bool = False):
         super().__init__(session_steps=session_steps, enable_citations=enable_citations)
         self.active_threads: Dict[str, Any] = {}
+        # Recently disconnected sessions, reused when the same thread reconnects
+        self.session_pool = SessionPool(max_size=128, burst_limit=256, ttl=300.0)
 
     async def initialize_session(self, app, thread_id: str):
         """
@@ -44,13 +48,16 @@ class CustomManager(ConnectionManager):
         await super().connect(websocket, thread_id, created_by, include_history, last_timestamp, session_type)
 
         # Custom connection logic
-        app = websocket.scope["app"]
-        self.active_threads[thread_id] = await self.initialize_session(app, thread_id)
+        session = self.session_pool.acquire(thread_id)
+        if session is None:
+            app = websocket.scope["app"]
+            session = await self.initialize_session(app, thread_id)
+        self.active_threads[thread_id] = session
 
     async def disconnect(self, thread_id: str):
         # Custom disconnect logic
         await self.save_session_state(thread_id)
-        self.active_threads.pop(thread_id, None)
+        self.session_pool.release(thread_id, self.active_threads.pop(thread_id, None))
 
         # Always call parent last (cleanup core resources)
         await super().disconnect(thread_id)
\ No newline at end of file
@@ -1,8 +1,11 @@
 """
     Utility modules for the PACI Agent application.
 """
-from app.utils.lru_dict import LRUDict
+from app.utils.lru_dict import LRUDict, fast_lru
+from app.utils.session_pool import SessionPool
 
 __all__ = [
     "LRUDict",
+    "fast_lru",
+    "SessionPool",
 ]
\ No newline at end of file
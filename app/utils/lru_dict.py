@@ -5,6 +5,12 @@ Provides a dictionary with automatic eviction of least recently used items
 when the maximum size is reached.
 """
 from collections import OrderedDict
+from typing import Any, MutableMapping
+
+try:
+    from lru import LRU  # lru-dict (optional, C-implemented LRU mapping)
+except ImportError:  # pragma: no cover - optional dependency
+    LRU = None
 
 
 class LRUDict(OrderedDict):
@@ -23,17 +29,33 @@ class LRUDict(OrderedDict):
         self.max_size = max_size
 
     def __setitem__(self, key, value):
-        # If key exists, remove and re-insert to mark it as most recently used
         if key in self:
-            del self[key]
-        elif len(self) >= self.max_size:
+            # Update in place and relink as most recently used
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            return
+        if len(self) >= self.max_size:
             # Pop the least recently used item (first inserted)
             self.popitem(last=False)
         super().__setitem__(key, value)
 
     def get(self, key, default=None):
-        if key in self:
-            value = self.pop(key)
-            self[key] = value  # Re-insert to mark as most recently used
-            return value
-        return default
\ No newline at end of file
+        try:
+            self.move_to_end(key)  # Mark as most recently used
+        except KeyError:
+            return default
+        return self[key]
+
+
+def fast_lru(max_size: int) -> MutableMapping[Any, Any]:
+    """
+    Return the fastest available LRU mapping holding at most max_size items.
+
+    Uses lru-dict's C implementation when it is installed and falls back to
+    LRUDict otherwise. Both evict the least recently used item on overflow and
+    count get() and assignment as a use, so callers needing only item access,
+    assignment and get() should prefer this over LRUDict.
+    """
+    if LRU is not None:
+        return LRU(max_size)
+    return LRUDict(max_size)
@@ -0,0 +1,70 @@
+"""
+Warm session pool.
+
+Keeps per-thread session resources alive for a short while after a
+WebSocket disconnects, so a client that reconnects to the same thread_id
+gets its already-initialized state back instead of rebuilding it.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class SessionPool:
+    """
+    Bounded, TTL-based pool of released session state keyed by thread_id.
+
+    Entries are kept in release order, and every entry gets the same TTL, so
+    the oldest entry is always the next to expire. Expired entries are
+    swept from the front lazily on release and acquire, which avoids a
+    background task. The pool is meant to be used from the event loop only,
+    so plain dict operations are enough and no lock is taken.
+
+    Args:
+        max_size: Soft limit; above it expired entries are swept before adding
+        burst_limit: Hard limit; above it the oldest entry is evicted
+        ttl: Seconds a released session stays reusable
+    """
+
+    def __init__(self, max_size: int = 128, burst_limit: int = 256, ttl: float = 300.0):
+        self.max_size = max_size
+        self.burst_limit = max(burst_limit, max_size)
+        self.ttl = ttl
+        self._warm: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+    def acquire(self, thread_id: str) -> Optional[Any]:
+        """Take the warm session for thread_id, or None if absent or expired."""
+        entry = self._warm.pop(thread_id, None)
+        if entry is None:
+            return None
+        state, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._sweep()
+            return None
+        return state
+
+    def release(self, thread_id: str, state: Any) -> None:
+        """Return a session to the pool so a reconnect can reuse it."""
+        if state is None:
+            return
+        self._warm.pop(thread_id, None)
+        if len(self._warm) >= self.max_size:
+            self._sweep()
+            while len(self._warm) >= self.burst_limit:
+                self._warm.popitem(last=False)
+        self._warm[thread_id] = (state, time.monotonic() + self.ttl)
+
+    def _sweep(self) -> None:
+        """Drop expired entries from the front of the pool."""
+        now = time.monotonic()
+        while self._warm:
+            _, expires_at = next(iter(self._warm.values()))
+            if expires_at > now:
+                break
+            self._warm.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._warm)
+
+    def __contains__(self, thread_id: object) -> bool:
+        return thread_id in self._warm
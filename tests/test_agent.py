@@ -0,0 +1,65 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+pytest.importorskip("gagent_core")
+
+from app.agent import MyAgent  # noqa: E402
+from app.utils import fast_lru  # noqa: E402
+
+
+def _agent() -> MyAgent:
+    # Skip BaseChatAgent.__init__; only the cache and state hooks are exercised
+    agent = MyAgent.__new__(MyAgent)
+    agent._response_cache = fast_lru(16)
+    agent.update_step = AsyncMock()
+    agent.load_state = AsyncMock(return_value={})
+    agent.save_state = AsyncMock()
+    return agent
+
+
+def test_cache_key_is_scoped_to_thread():
+    key_a = MyAgent._response_cache_key("t1", "Hello", "ali", None, None)
+    key_b = MyAgent._response_cache_key("t2", "Hello", "ali", None, None)
+    assert key_a != key_b
+    assert key_a == MyAgent._response_cache_key("t1", "  hello ", "ali", None, None)
+
+
+@pytest.mark.parametrize(
+    "user_name, user_context, files",
+    [
+        (None, None, None),
+        ("ali", {}, None),
+        ("ali", {"civil_id": "1"}, None),
+        ("ali", None, [{"name": "a.pdf"}]),
+    ],
+)
+def test_cache_key_skips_uncacheable_requests(user_name, user_context, files):
+    assert MyAgent._response_cache_key("t1", "hello", user_name, user_context, files) is None
+
+
+def test_cache_hit_rebuilds_plan_and_tracks_steps():
+    agent = _agent()
+    _, first = asyncio.run(agent.process_message("t1", "hello", "ali", None, None, None))
+    first["plan"]["intent"] = "mutated"
+
+    agent.update_step.reset_mock()
+    response, meta = asyncio.run(agent.process_message("t1", "hello", "ali", None, None, None))
+    assert meta["cache_hit"] is True
+    assert meta["plan"]["intent"] == "general_assistance"
+    assert [c.args for c in agent.update_step.await_args_list] == [("t1", s) for s in range(4)]
+    agent.save_state.assert_awaited()
+
+    meta["plan"]["intent"] = "mutated"
+    _, again = asyncio.run(agent.process_message("t1", "hello", "ali", None, None, None))
+    assert again["plan"]["intent"] == "general_assistance"
+
+
+def test_cache_hit_plan_uses_current_query():
+    agent = _agent()
+    asyncio.run(agent.process_message("t1", "Hello ", "ali", None, None, None))
+    response, meta = asyncio.run(agent.process_message("t1", "hello", "ali", None, None, None))
+    assert meta["cache_hit"] is True
+    assert meta["plan"]["query"] == "hello"
+    assert response == "I understood your request: Hello "
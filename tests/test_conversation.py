@@ -0,0 +1,64 @@
+import time
+
+from app.context.conversation import ConversationContext, ConversationTurn
+
+
+def _turn(message: str, topics=()) -> ConversationTurn:
+    return ConversationTurn(
+        timestamp=time.monotonic_ns(),
+        user_message=message,
+        detected_language="en",
+        topics_discussed=list(topics),
+    )
+
+
+def _fresh_render(ctx: ConversationContext) -> str:
+    clone = ConversationContext(thread_id=ctx.thread_id)
+    for turn in ctx.turns:
+        clone.add_turn(turn)
+    for service in ctx.mentioned_services:
+        clone.add_service(service)
+    clone.conversation_goal = ctx.conversation_goal
+    clone.unresolved_query = ctx.unresolved_query
+    return clone.to_prompt_context()
+
+
+def test_first_interaction_prompt():
+    ctx = ConversationContext(thread_id="t1")
+    assert "new conversation" in ctx.to_prompt_context()
+
+
+def test_add_turn_extends_cached_prompt(monkeypatch):
+    ctx = ConversationContext(thread_id="t1")
+    ctx.add_turn(_turn("how do I renew my civil id", topics=["civil_id"]))
+    ctx.add_service("Civil ID renewal")
+    ctx.conversation_goal = "renew civil id"
+    ctx.to_prompt_context()
+
+    ctx.add_turn(_turn("what documents do I need", topics=["documents"]))
+    cached = ctx._prompt_cache
+    assert cached is not None
+
+    # The following turn is served from the cache without re-rendering
+    def fail(self):
+        raise AssertionError("prompt was re-rendered")
+
+    monkeypatch.setattr(ConversationContext, "_render_prompt", fail)
+    assert ctx.to_prompt_context() is cached
+    monkeypatch.undo()
+
+    assert "2 previous exchanges" in cached
+    assert "civil_id, documents" in cached
+    assert cached == _fresh_render(ctx)
+
+
+def test_state_change_invalidates_cached_prompt():
+    ctx = ConversationContext(thread_id="t1")
+    ctx.add_turn(_turn("hello"))
+    ctx.to_prompt_context()
+    ctx.add_turn(_turn("track my request"))
+
+    ctx.unresolved_query = "request status"
+    rendered = ctx.to_prompt_context()
+    assert "**Pending Question:** request status" in rendered
+    assert rendered == _fresh_render(ctx)
@@ -0,0 +1,74 @@
+"""Tests for the demo SPA router."""
+import gzip
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")  # required by fastapi.testclient
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import demo_router
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(demo_router.router)
+    return TestClient(app)
+
+
+def test_demo_page_is_served(client):
+    response = client.get("/spa/", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert response.headers["etag"] == demo_router._ETAG
+    assert b"<html" in response.content
+    assert response.content == demo_router._BODY
+
+
+def test_demo_page_gzip_matches_body(client):
+    response = client.get("/spa/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    # httpx decodes the body transparently; the raw variant must round-trip too
+    assert gzip.decompress(demo_router._ENCODED["gzip"]) == demo_router._BODY
+    assert response.content == demo_router._BODY
+
+
+def test_demo_page_brotli_matches_body(client):
+    brotli = pytest.importorskip("brotli")
+    response = client.get("/spa/", headers={"Accept-Encoding": "gzip, br"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(demo_router._ENCODED["br"]) == demo_router._BODY
+    assert response.content == demo_router._BODY
+
+
+def test_demo_page_brotli_refused_falls_back_to_gzip(client):
+    pytest.importorskip("brotli")
+    response = client.get("/spa/", headers={"Accept-Encoding": "br;q=0, gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_demo_page_not_modified(client):
+    response = client.get("/spa/", headers={"If-None-Match": demo_router._ETAG})
+    assert response.status_code == 304
+
+
+def test_build_page_without_minifiers(monkeypatch):
+    monkeypatch.setattr(demo_router, "rjsmin", None)
+    monkeypatch.setattr(demo_router, "rcssmin", None)
+    raw = demo_router._HTML_PATH.read_bytes()
+    built = demo_router._build_page(raw)
+    # Only the palette references are resolved; scripts are left as written
+    assert demo_router._SCRIPT_RE.findall(built.decode("utf-8")) == \
+        demo_router._SCRIPT_RE.findall(raw.decode("utf-8"))
+
+
+def test_build_page_minifies_when_available():
+    pytest.importorskip("rjsmin")
+    pytest.importorskip("rcssmin")
+    raw = demo_router._HTML_PATH.read_bytes()
+    assert len(demo_router._build_page(raw)) < len(raw) * 0.7
@@ -0,0 +1,66 @@
+import pytest
+
+from app.utils import LRUDict, fast_lru
+from app.utils import lru_dict
+
+
+@pytest.fixture(params=["python", "c"])
+def make_lru(request):
+    # Both fast_lru() backends, held to the contract fast_lru() documents
+    if request.param == "python":
+        return LRUDict
+    if lru_dict.LRU is None:
+        pytest.skip("lru-dict not installed")
+    return lru_dict.LRU
+
+
+def test_evicts_least_recently_inserted(make_lru):
+    cache = make_lru(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["c"] = 3
+    assert "a" not in cache
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_get_counts_as_use(make_lru):
+    cache = make_lru(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+    assert "a" in cache
+    assert "b" not in cache
+
+
+def test_assignment_counts_as_use(make_lru):
+    cache = make_lru(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["a"] = 10
+    cache["c"] = 3
+    assert cache.get("a") == 10
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_get_missing_returns_default(make_lru):
+    cache = make_lru(2)
+    assert cache.get("missing") is None
+    assert cache.get("missing", 0) == 0
+    assert len(cache) == 0
+
+
+def test_fast_lru_prefers_c_backend():
+    if lru_dict.LRU is None:
+        pytest.skip("lru-dict not installed")
+    assert isinstance(fast_lru(4), lru_dict.LRU)
+
+
+def test_fast_lru_falls_back_to_lrudict(monkeypatch):
+    monkeypatch.setattr(lru_dict, "LRU", None)
+    cache = fast_lru(4)
+    assert isinstance(cache, LRUDict)
+    assert cache.max_size == 4
@@ -0,0 +1,98 @@
+import pytest
+
+from app.utils import SessionPool
+from app.utils import session_pool
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(session_pool.time, "monotonic", clock)
+    return clock
+
+
+def test_reuse_after_disconnect(clock):
+    pool = SessionPool(ttl=10.0)
+    state = {"history": ["hi"]}
+    pool.release("t1", state)
+    assert "t1" in pool
+
+    clock.now += 9.0
+    assert pool.acquire("t1") is state
+    # Acquiring takes the session out of the pool
+    assert "t1" not in pool
+    assert pool.acquire("t1") is None
+
+
+def test_release_ignores_none(clock):
+    pool = SessionPool()
+    pool.release("t1", None)
+    assert len(pool) == 0
+
+
+def test_ttl_expiry(clock):
+    pool = SessionPool(ttl=10.0)
+    pool.release("t1", "old")
+    clock.now += 5.0
+    pool.release("t2", "new")
+
+    clock.now += 5.0
+    assert pool.acquire("t1") is None
+    assert pool.acquire("t2") == "new"
+
+
+def test_expired_entries_are_swept_on_acquire(clock):
+    pool = SessionPool(ttl=10.0)
+    for i in range(3):
+        pool.release(f"t{i}", i)
+    pool.release("fresh", "x")
+    clock.now += 10.0
+    pool.release("fresh", "x")
+
+    assert pool.acquire("t0") is None
+    assert len(pool) == 1
+    assert "fresh" in pool
+
+
+def test_expired_entries_are_swept_at_max_size(clock):
+    pool = SessionPool(max_size=3, burst_limit=5, ttl=10.0)
+    for i in range(3):
+        pool.release(f"t{i}", i)
+    clock.now += 10.0
+    pool.release("t3", 3)
+
+    assert len(pool) == 1
+    assert "t3" in pool
+
+
+def test_capacity_bound_evicts_oldest(clock):
+    pool = SessionPool(max_size=2, burst_limit=3, ttl=60.0)
+    for i in range(10):
+        pool.release(f"t{i}", i)
+        assert len(pool) <= 3
+
+    assert len(pool) == 3
+    assert [f"t{i}" in pool for i in range(10)] == [False] * 7 + [True] * 3
+
+
+def test_rerelease_refreshes_position(clock):
+    pool = SessionPool(max_size=2, burst_limit=2, ttl=60.0)
+    pool.release("t0", 0)
+    pool.release("t1", 1)
+    pool.release("t0", 0)
+    pool.release("t2", 2)
+
+    assert "t0" in pool
+    assert "t1" not in pool
+
+
+def test_burst_limit_never_below_max_size():
+    assert SessionPool(max_size=8, burst_limit=4).burst_limit == 8
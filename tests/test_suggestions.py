@@ -0,0 +1,78 @@
+import pytest
+
+from app.context import suggestions
+from app.context.suggestions import (
+    ProactiveSuggestionEngine,
+    _build_topic_matcher,
+    _get_topic_keywords,
+    _index_keywords,
+)
+
+# Hand-made keyword sets exercising overlaps: prefixes ("sign" / "signature"),
+# keywords inside others ("id" / "civil id"), keywords running into each other
+# ("help" + "pin" in "helpin") and one keyword shared by two topics.
+OVERLAPPING_KEYWORDS = {
+    "a": ("sign", "civil id", "help"),
+    "b": ("signature", "id", "pin"),
+    "c": ("id card", "card", "رقم سري", "رقم"),
+    "d": ("help",),
+}
+
+TEXTS = [
+    "",
+    "hello",
+    "signature",
+    "sign here",
+    "my civil id card",
+    "civilid",
+    "helpin",
+    "help me with pin",
+    "id card renewal",
+    "card",
+    "رقم سري",
+    "نسيت الرقم السري",
+    "رقم",
+    "Civil ID CARD",
+    "I need to renew my civil id before it expires",
+    "تبي موعد حجز لتجديد البطاقة المدنية",
+    "paci service information",
+    "digital certificate with encrypt",
+    "schedule a visit, any slot available?",
+]
+
+
+def _any_loop(topic_keywords, text):
+    # Reference implementation: the original per-topic any() scan
+    text_lower = text.lower()
+    return {
+        topic
+        for topic, keywords in topic_keywords.items()
+        if any(keyword in text_lower for keyword in keywords)
+    }
+
+
+@pytest.fixture(params=["regex", "ahocorasick"])
+def backend(request, monkeypatch):
+    if request.param == "regex":
+        monkeypatch.setattr(suggestions, "ahocorasick", None)
+    elif suggestions.ahocorasick is None:
+        pytest.skip("pyahocorasick not installed")
+    return request.param
+
+
+@pytest.mark.parametrize(
+    "topic_keywords",
+    [OVERLAPPING_KEYWORDS, _get_topic_keywords()],
+    ids=["overlapping", "topic_keywords"],
+)
+@pytest.mark.parametrize("text", TEXTS)
+def test_matcher_matches_any_loop(backend, topic_keywords, text):
+    match = _build_topic_matcher(_index_keywords(topic_keywords))
+    assert match(text.lower()) == _any_loop(topic_keywords, text)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_detect_topics_keeps_topic_order(text):
+    topic_keywords = _get_topic_keywords()
+    expected = [topic for topic in topic_keywords if topic in _any_loop(topic_keywords, text)]
+    assert ProactiveSuggestionEngine().detect_topics(text) == expected